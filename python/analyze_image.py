@@ -1,115 +1,408 @@
+import argparse
+import asyncio
 import base64
+import functools
+import hashlib
+import io
 import sys
+import tempfile
+import time
 import json
+import logging
 import os
 from pathlib import Path
 import openai
+from prompts import (
+    AVAILABILITY_PROMPT,
+    AVAILABILITY_PROMPT_VERSION,
+    AVAILABILITY_SYSTEM_PROMPT,
+    BATCH_PROMPT_PREFIX,
+    SALE_PROMPT,
+    SALE_PROMPT_VERSION,
+    SALE_SYSTEM_PROMPT,
+)
 
-# Load API key from config file
-config_path = Path(__file__).parent / "config.json"
+# orjson parses responses faster; fall back to the stdlib json module without it
 try:
-    with open(config_path, "r") as config_file:
-        config = json.load(config_file)
-        api_key = config.get("openai_api_key")
-        if not api_key:
-            print("Error: API key not found in config file")
-            sys.exit(1)
-except FileNotFoundError:
-    print(f"Error: Config file not found at {config_path}")
-    print("Please create a config.json file with your OpenAI API key")
-    sys.exit(1)
-except json.JSONDecodeError:
-    print(f"Error: Config file at {config_path} is not valid JSON")
-    sys.exit(1)
+    import orjson
+except ImportError:
+    orjson = None
+
+# Pillow lets images be downscaled before upload; without it files are sent as-is
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Config file holding the OpenAI API key, used when OPENAI_API_KEY is not set
+config_path = Path(__file__).parent / "config.json"
+
+@functools.lru_cache(maxsize=1)
+def _load_config():
+    """Loads config.json once and caches the parsed result"""
+    try:
+        with open(config_path, "r") as config_file:
+            return json.load(config_file)
+    except FileNotFoundError:
+        print(f"Error: Config file not found at {config_path}")
+        print("Please set OPENAI_API_KEY or create a config.json file with your OpenAI API key")
+        sys.exit(1)
+    except json.JSONDecodeError:
+        print(f"Error: Config file at {config_path} is not valid JSON")
+        sys.exit(1)
+
+def _get_api_key():
+    """Returns the OpenAI API key from OPENAI_API_KEY, falling back to the config file"""
+    api_key = os.environ.get("OPENAI_API_KEY") or _load_config().get("openai_api_key")
+    if not api_key:
+        print("Error: API key not found in OPENAI_API_KEY or config file")
+        sys.exit(1)
+    return api_key
+
+@functools.lru_cache(maxsize=1)
+def _get_client():
+    """Returns a shared OpenAI client so the connection pool is reused across calls"""
+    return openai.OpenAI(api_key=_get_api_key())
+
+# System prompt, user prompt and cache version for each analysis mode
+MODES = {
+    "sale": (SALE_SYSTEM_PROMPT, SALE_PROMPT, SALE_PROMPT_VERSION),
+    "availability": (AVAILABILITY_SYSTEM_PROMPT, AVAILABILITY_PROMPT, AVAILABILITY_PROMPT_VERSION),
+}
+DEFAULT_MODE = "sale"
+
+# Maximum number of images sent in a single analyze_images request
+MAX_BATCH_SIZE = 8
+
+# Maximum number of in-flight requests made by run_many
+MAX_CONCURRENT_REQUESTS = 16
+
+# On-disk cache of analysis results, keyed by image content
+CACHE_DIR = Path(__file__).parent / ".gptcache"
+CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
 
-# Initialize OpenAI client
-client = openai.OpenAI(api_key=api_key)
+# Expired cache files are swept on store at most this often; the marker file's mtime
+# records the last sweep so the throttle holds across CLI invocations
+CACHE_SWEEP_INTERVAL_SECONDS = 24 * 60 * 60
+CACHE_SWEEP_MARKER = CACHE_DIR / ".last_sweep"
+
+# The vision model fits images within 2048x2048 and then scales the short side to 768px,
+# so anything larger only costs upload bytes and encoding time
+MAX_IMAGE_LONG_SIDE = 2048
+MAX_IMAGE_SHORT_SIDE = 768
+JPEG_QUALITY = 85
+
+# Read size for encode_image; a multiple of 3 so no chunk produces padding
+ENCODE_CHUNK_SIZE = 48 * 1024
+
+def _downscale_image(image_path):
+    """Returns the image as JPEG bytes, shrunk the way the vision model would shrink it anyway"""
+    with Image.open(image_path) as img:
+        width, height = img.size
+        scale = min(1.0, MAX_IMAGE_LONG_SIDE / max(width, height), MAX_IMAGE_SHORT_SIDE / min(width, height))
+        if scale < 1.0:
+            img.thumbnail((round(width * scale), round(height * scale)), Image.LANCZOS)
+        buffer = io.BytesIO()
+        img.convert("RGB").save(buffer, "JPEG", quality=JPEG_QUALITY)
+    return buffer.getvalue()
 
 def encode_image(image_path):
-    """Reads and encodes an image in base64 format"""
+    """Reads and encodes an image in base64 format, downscaling it first when Pillow is available"""
+    if Image is not None:
+        try:
+            return base64.b64encode(_downscale_image(image_path)).decode("ascii")
+        except OSError:
+            # Not something Pillow can read; send the file unchanged
+            pass
+
+    # Encode the raw file one chunk at a time
+    encoded = bytearray()
     with open(image_path, "rb") as image_file:
-        return base64.b64encode(image_file.read()).decode("utf-8")
+        while chunk := image_file.read(ENCODE_CHUNK_SIZE):
+            encoded += base64.b64encode(chunk)
+    return encoded.decode("ascii")
 
-def clean_json_response(response_text):
-    """Cleans GPT response to extract pure JSON"""
-    response_text = response_text.strip()
-    
-    # Remove surrounding triple backticks if present
-    if response_text.startswith("```json"):
-        response_text = response_text[7:]  # Remove ```json
-    if response_text.endswith("```"):
-        response_text = response_text[:-3]  # Remove ```
-    
-    return response_text.strip()
+def is_remote_image(image_source):
+    """Returns True if the image source is an http(s) URL the API can fetch itself"""
+    return str(image_source).startswith(("http://", "https://"))
+
+def image_url_for(image_source):
+    """Returns the URL to send to the API, passing remote URLs through without re-uploading"""
+    if is_remote_image(image_source):
+        return image_source
+    return f"data:image/jpeg;base64,{encode_image(image_source)}"
 
-def analyze_image(image_path):
-    """Sends image to GPT-4 Turbo Vision API and returns structured JSON"""
+def _cache_key(image_path, prompt_version):
+    """Returns the cache key for an image: a BLAKE2 digest of its bytes plus the prompt version"""
+    digest = hashlib.blake2b(digest_size=32)
+    with open(image_path, "rb") as image_file:
+        while chunk := image_file.read(ENCODE_CHUNK_SIZE):
+            digest.update(chunk)
+    return f"{digest.hexdigest()}-{prompt_version}"
+
+def _read_json(path):
+    """Reads a JSON cache file, returning None if it is missing or unreadable"""
     try:
-        image_base64 = encode_image(image_path)
+        with open(path, "r") as json_file:
+            return json.load(json_file)
+    except (OSError, json.JSONDecodeError):
+        return None
 
-        response = client.chat.completions.create(
+def _write_json(path, data):
+    """Writes JSON atomically so concurrent readers never see a partial file"""
+    CACHE_DIR.mkdir(exist_ok=True)
+    # A unique temp file per write, so concurrent threads and processes never share one
+    with tempfile.NamedTemporaryFile("w", dir=CACHE_DIR, suffix=".tmp", delete=False) as json_file:
+        tmp_path = json_file.name
+        json.dump(data, json_file)
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        os.unlink(tmp_path)
+        raise
+
+def _read_cache_entry(cache_key):
+    """Returns the cached result for a key, or None if missing or expired"""
+    entry_path = CACHE_DIR / f"{cache_key}.json"
+    try:
+        if time.time() - entry_path.stat().st_mtime > CACHE_TTL_SECONDS:
+            entry_path.unlink(missing_ok=True)
+            return None
+    except OSError:
+        return None
+    return _read_json(entry_path)
+
+def _sweep_expired_cache_files():
+    """Deletes cache files older than CACHE_TTL_SECONDS, at most once per sweep interval"""
+    now = time.time()
+    try:
+        if now - CACHE_SWEEP_MARKER.stat().st_mtime < CACHE_SWEEP_INTERVAL_SECONDS:
+            return
+    except FileNotFoundError:
+        pass
+    CACHE_SWEEP_MARKER.touch()
+
+    with os.scandir(CACHE_DIR) as entries:
+        for entry in entries:
+            # Covers result files and temp files left behind by interrupted writes
+            if not entry.name.endswith((".json", ".tmp")):
+                continue
+            try:
+                if now - entry.stat().st_mtime > CACHE_TTL_SECONDS:
+                    os.unlink(entry.path)
+            except OSError:
+                pass
+
+def lookup_cached_result(image_source, prompt_version):
+    """Returns (cache_key, cached_result) for an image; cached_result is None on a miss"""
+    if is_remote_image(image_source):
+        return None, None
+
+    cache_key = _cache_key(image_source, prompt_version)
+    result = _read_cache_entry(cache_key)
+    return cache_key, result
+
+def store_cached_result(cache_key, result):
+    """Caches a successful analysis result under the key from lookup_cached_result"""
+    if cache_key is None or "error" in result:
+        return
+    try:
+        _write_json(CACHE_DIR / f"{cache_key}.json", result)
+        _sweep_expired_cache_files()
+    except OSError:
+        # The cache is best-effort; never fail an analysis because of it
+        pass
+
+def parse_json(text):
+    """Parses a JSON string, using orjson when it is installed"""
+    if orjson is not None:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either
+        return orjson.loads(text)
+    return json.loads(text)
+
+def analyze_image(image_source, mode=DEFAULT_MODE):
+    """Sends image to GPT-4 Turbo Vision API and returns structured JSON for the given mode"""
+    system_prompt, prompt_text, prompt_version = MODES[mode]
+    try:
+        cache_key, cached_result = lookup_cached_result(image_source, prompt_version)
+        if cached_result is not None:
+            return cached_result
+
+        image_url = image_url_for(image_source)
+
+        response = _get_client().chat.completions.create(
             model="gpt-4o-mini",
             messages=[
-                {"role": "system", "content": "You are an AI that extracts structured eCommerce insights from images."},
+                {"role": "system", "content": system_prompt},
                 {"role": "user", "content": [
-                    {"type": "text", "text": """
-                        Analyze this image and return JSON with the following:
-                        - "isEcommerce" (true/false): Is this an eCommerce-related image?
-                        - "isProductPage" (true/false): Does the image show a product page?
-                        - "isOnSale" (true/false): Does the image indicate that this specific product has a reduced price? Look for:
-                        * Crossed-out original price with a lower current price
-                        * Explicit percentage or amount off this specific product
-                        * Product-specific sale tags/badges (like "Sale", "Discount", "Limited offer")
-                        * Price comparison showing savings on this exact product
-                        - "confidence" (0-1): How confident are you that the product is on sale?
-                        - "productName" (string): If visible, what is the product name?
-                        - "price" (string): If available, what is the current price?
-                        - "originalPrice" (string): If available, what was the original price before discount?
-                        - "currency" (string): If a price is detected, what is the currency?
-                        - "discountPercentage" (float): If applicable, what is the discount percentage?
-                        - "otherInsights" (string): Any additional useful insights?
-                        - "discountDetails" (string): If applicable, what are the specific terms of this product's discount?
-                        
-                        IMPORTANT: Do NOT mark a product as on sale if you only see:
-                        - Generic site-wide banners (e.g., "Summer sale")
-                        - Promotional codes that apply to the entire cart
-                        - Free shipping offers
-                        - Loyalty program benefits
-                        - Future/upcoming sales
-                        - "New arrival" or similar non-discount indicators
-                        
-                        A product is on sale ONLY if there's clear evidence of a price reduction for THIS SPECIFIC product visible in the image.
-                        
-                        Respond **only** with valid JSON, no explanations, and no code formatting (no backticks).
-                    """},
-                    {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_base64}"}}
+                    {"type": "text", "text": prompt_text},
+                    {"type": "image_url", "image_url": {"url": image_url}}
                 ]}
             ],
-            max_tokens=400
+            max_tokens=400,
+            response_format={"type": "json_object"}
         )
 
-        # Print raw response for debugging
         raw_response = response.choices[0].message.content
-        print("Raw Response:", raw_response)  # Debugging step
+        logger.debug("Raw response: %s", raw_response)
 
-        # Clean and parse the JSON response
-        cleaned_response = clean_json_response(raw_response)
-        return json.loads(cleaned_response)
+        # JSON mode guarantees a bare JSON object, so it parses directly
+        result = parse_json(raw_response)
+        store_cached_result(cache_key, result)
+        return result
 
     except json.JSONDecodeError:
-        return {"error": "Invalid JSON response after cleaning"}
+        return {"error": "Invalid JSON response"}
     except Exception as e:
         return {"error": str(e)}
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Please provide an image path as an argument.")
-        sys.exit(1)
+async def analyze_image_async(image_source, sem, client, mode=DEFAULT_MODE):
+    """Async version of analyze_image; sem bounds how many requests run at once"""
+    system_prompt, prompt_text, prompt_version = MODES[mode]
+    async with sem:
+        try:
+            cache_key, cached_result = await asyncio.to_thread(lookup_cached_result, image_source, prompt_version)
+            if cached_result is not None:
+                return cached_result
+
+            # Encoding is CPU-bound, so keep it off the event loop
+            image_url = await asyncio.to_thread(image_url_for, image_source)
+
+            response = await client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": [
+                        {"type": "text", "text": prompt_text},
+                        {"type": "image_url", "image_url": {"url": image_url}}
+                    ]}
+                ],
+                max_tokens=400,
+                response_format={"type": "json_object"}
+            )
+
+            raw_response = response.choices[0].message.content
+            logger.debug("Raw response: %s", raw_response)
+
+            # JSON mode guarantees a bare JSON object; at max_tokens=400 it is cheap to parse inline
+            result = parse_json(raw_response)
+            await asyncio.to_thread(store_cached_result, cache_key, result)
+            return result
+
+        except json.JSONDecodeError:
+            return {"error": "Invalid JSON response"}
+        except Exception as e:
+            return {"error": str(e)}
+
+async def _run_many(image_sources, concurrency, mode):
+    """Runs analyze_image_async over all images with one shared AsyncOpenAI client"""
+    sem = asyncio.Semaphore(concurrency)
+    async with openai.AsyncOpenAI(api_key=_get_api_key()) as client:
+        return await asyncio.gather(*[analyze_image_async(image_source, sem, client, mode) for image_source in image_sources])
+
+def run_many(image_sources, concurrency=MAX_CONCURRENT_REQUESTS, mode=DEFAULT_MODE):
+    """Analyzes each image with its own request, running up to concurrency requests at once"""
+    return asyncio.run(_run_many(image_sources, concurrency, mode))
+
+def analyze_images(image_sources, mode=DEFAULT_MODE):
+    """Sends several images per API call and returns one result dict per image, in order"""
+    prompt_version = MODES[mode][2]
+    results = [None] * len(image_sources)
+
+    # Only images without a cached result are sent to the API
+    pending = []
+    for position, image_source in enumerate(image_sources):
+        try:
+            cache_key, cached_result = lookup_cached_result(image_source, prompt_version)
+        except OSError as e:
+            # An unreadable image fails on its own, as it would in analyze_image
+            results[position] = {"error": str(e)}
+            continue
+        if cached_result is not None:
+            results[position] = cached_result
+        else:
+            pending.append((position, image_source, cache_key))
+
+    for start in range(0, len(pending), MAX_BATCH_SIZE):
+        batch = pending[start:start + MAX_BATCH_SIZE]
+        batch_results = _analyze_batch([image_source for _, image_source, _ in batch], mode)
+        for (position, image_source, cache_key), result in zip(batch, batch_results):
+            store_cached_result(cache_key, result)
+            results[position] = result
+    return results
+
+def _analyze_batch(image_sources, mode):
+    """Analyzes up to MAX_BATCH_SIZE images with a single chat completion"""
+    system_prompt, prompt_text, _ = MODES[mode]
+    try:
+        content = [{"type": "text", "text": BATCH_PROMPT_PREFIX.format(count=len(image_sources), last=len(image_sources) - 1) + prompt_text}]
+        for image_source in image_sources:
+            content.append({"type": "image_url", "image_url": {"url": image_url_for(image_source)}})
+
+        response = _get_client().chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": content}
+            ],
+            max_tokens=400 * len(image_sources),
+            response_format={"type": "json_object"}
+        )
+
+        raw_response = response.choices[0].message.content
+        logger.debug("Raw response: %s", raw_response)
+
+        # Parse the results array, matching entries back to images by index
+        parsed = parse_json(raw_response).get("results")
+        if not isinstance(parsed, list):
+            raise json.JSONDecodeError("Expected a results array", raw_response, 0)
+
+        results = [{"error": "No result returned for this image"} for _ in image_sources]
+        for position, item in enumerate(parsed):
+            if not isinstance(item, dict):
+                continue
+            index = item.pop("index", position)
+            # The model sometimes returns the index as a string ("0")
+            if isinstance(index, str) and index.strip().isdigit():
+                index = int(index)
+            if not isinstance(index, int) or isinstance(index, bool) or not 0 <= index < len(results):
+                index = position
+            if index < len(results):
+                results[index] = item
+        return results
+
+    except json.JSONDecodeError:
+        return [{"error": "Invalid JSON response"} for _ in image_sources]
+    except Exception as e:
+        return [{"error": str(e)} for _ in image_sources]
+
+def main(argv=None):
+    """Command-line entry point: prints the analysis of one or more images as JSON"""
+    parser = argparse.ArgumentParser(description='Analyze product page screenshots with the OpenAI vision API')
+    parser.add_argument('images', nargs='+',
+                      help='Image paths or http(s) URLs to analyze')
+    parser.add_argument('--mode', choices=sorted(MODES), default=DEFAULT_MODE,
+                      help='What to extract from the images')
+    parser.add_argument('--verbose', action='store_true',
+                      help='Log raw model responses to stderr')
+    args = parser.parse_args(argv)
     
-    image_path = sys.argv[1]
-    if not Path(image_path).is_file():
-        print("Invalid image path.")
-        sys.exit(1)
+    # Logs go to stderr so stdout stays pure JSON for callers
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING, stream=sys.stderr)
     
-    result = analyze_image(image_path)
+    for image_source in args.images:
+        if not is_remote_image(image_source) and not Path(image_source).is_file():
+            print(f"Invalid image path: {image_source}")
+            sys.exit(1)
+    
+    # A single image keeps the original single-object output
+    if len(args.images) == 1:
+        result = analyze_image(args.images[0], args.mode)
+    else:
+        result = analyze_images(args.images, args.mode)
     print(json.dumps(result, indent=2))  # Pretty-print JSON
+
+if __name__ == "__main__":
+    main()
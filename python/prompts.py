@@ -0,0 +1,35 @@
+# Prompts for each analyze_image.py mode.
+# Bump a mode's *_PROMPT_VERSION whenever its prompt changes so results cached under the old prompt are ignored.
+
+SALE_SYSTEM_PROMPT = "You are an AI that extracts structured eCommerce insights from images."
+
+SALE_PROMPT = """\
+Return a JSON object with these keys:
+- isEcommerce, isProductPage (bool)
+- isOnSale (bool): true only if THIS product shows a price cut: crossed-out price, product-specific % or amount off, sale badge, or savings vs. its original price. Site-wide banners, cart-wide codes, free shipping, loyalty perks, upcoming sales and "new" tags do not count.
+- confidence (0-1): that it is on sale
+- productName, price, originalPrice, currency (string)
+- discountPercentage (number)
+- discountDetails, otherInsights (string)
+"""
+
+SALE_PROMPT_VERSION = "sale-2"
+
+AVAILABILITY_SYSTEM_PROMPT = "You are an AI that extracts structured eCommerce product availability insights from images."
+
+AVAILABILITY_PROMPT = """\
+Return a JSON object with these keys:
+- isEcommerce, isProductPage (bool)
+- isAvailable (bool): true only if the product can clearly be bought now. Check stock labels, add-to-cart state, inventory counts, shipping estimates; "sold out", waitlist/notify or "temporarily unavailable" mean false.
+- confidence (0-1): in the availability status
+- productName (string)
+- stockStatus: "In Stock", "Out of Stock", "Limited Stock", "Backordered", "Pre-order" or "Unknown"
+- availabilityDetails (string), e.g. "Only 5 left"
+"""
+
+AVAILABILITY_PROMPT_VERSION = "availability-2"
+
+# Prepended to a mode's prompt when several images are sent in one request
+BATCH_PROMPT_PREFIX = """\
+You will receive {count} images, numbered 0 to {last}. Return a JSON object {{"results": [...]}} with one object per image, in order, each with an "index" key plus the keys below. Judge each image on its own.
+"""
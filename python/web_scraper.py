@@ -1,80 +1,251 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 import argparse
+import asyncio
+import atexit
+import functools
+import importlib.util
+import queue
+import threading
 import time
 
-def scrape_website(url, wait_time=0, use_selenium=False):
+# selectolax parses HTML in C and is much faster than BeautifulSoup; fall back to bs4 without it.
+# Its Lexbor backend (selectolax >= 0.3, the only one left in 1.x) is preferred; the older
+# Modest backend in selectolax.parser is used only on pre-1.0 installs without Lexbor.
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        HTMLParser = None
+        from bs4 import BeautifulSoup
+
+# Timeout in seconds for plain HTTP requests
+REQUEST_TIMEOUT = 10
+
+# Shared session so repeated scrapes reuse pooled keep-alive connections
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+_SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+
+# Upper bound in seconds on waiting for a --wait-for selector when no wait time is given
+DEFAULT_SELENIUM_WAIT = 10
+
+# Idle headless Chrome drivers kept for reuse by Selenium scrapes
+MAX_POOLED_DRIVERS = 4
+_DRIVER_POOL = queue.Queue(maxsize=MAX_POOLED_DRIVERS)
+_ALL_DRIVERS = set()
+_DRIVERS_LOCK = threading.Lock()
+
+# Elements whose content is never useful page text
+STRIP_TAGS = ('style', 'script', 'link', 'meta', 'noscript', 'svg')
+
+# The same elements as one CSS selector, so they are matched in a single pass
+STRIP_SELECTOR = ','.join(STRIP_TAGS)
+
+# Run in the browser to drop STRIP_SELECTOR elements and return the rendered page text
+EXTRACT_TEXT_SCRIPT = """
+document.querySelectorAll(arguments[0]).forEach(e => e.remove());
+return document.body ? document.body.innerText : '';
+"""
+
+def extract_text(html):
+    """Returns the visible text of an HTML document, one block per line"""
+    if HTMLParser is not None:
+        tree = HTMLParser(html)
+        tree.strip_tags(list(STRIP_TAGS))
+        # Use the whole document (not just <body>) so <title> text is kept, as with bs4
+        if tree.root is None:
+            return ''
+        # Drop the empty lines left by whitespace-only text nodes, matching bs4's output
+        text = tree.root.text(separator='\n', strip=True)
+        return '\n'.join(line for line in text.split('\n') if line)
+
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # Remove unnecessary elements
+    for element in soup.select(STRIP_SELECTOR):
+        element.decompose()
+        
+    # Get text content
+    return soup.get_text(separator='\n', strip=True)
+
+@functools.lru_cache(maxsize=1)
+def _chromedriver_path():
+    """Installs chromedriver once per process and returns its path"""
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+def _create_driver():
+    """Starts a new headless Chrome driver and tracks it for shutdown"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    
+    # Set up headless Chrome browser
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--disable-gpu")
+    
+    # Initialize browser
+    driver = webdriver.Chrome(service=Service(_chromedriver_path()), options=chrome_options)
+    with _DRIVERS_LOCK:
+        _ALL_DRIVERS.add(driver)
+    return driver
+
+def _acquire_driver():
+    """Returns an idle pooled driver, starting a new one if none is free"""
+    try:
+        return _DRIVER_POOL.get_nowait()
+    except queue.Empty:
+        return _create_driver()
+
+def _reset_driver(driver):
+    """Clears cookies and storage so the next scrape starts from a clean browser profile"""
+    # Web storage is per-origin, so clear it while still on the scraped page
+    driver.execute_script("try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}")
+    driver.delete_all_cookies()
+    # delete_all_cookies only covers the current domain; drop third-party cookies too
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    driver.get("about:blank")
+
+def _release_driver(driver):
+    """Resets a driver and returns it to the pool, quitting it if that fails or the pool is full"""
+    try:
+        _reset_driver(driver)
+        _DRIVER_POOL.put_nowait(driver)
+    except Exception:
+        _quit_driver(driver)
+
+def _quit_driver(driver):
+    """Quits a driver and stops tracking it"""
+    with _DRIVERS_LOCK:
+        _ALL_DRIVERS.discard(driver)
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+def _shutdown_all():
+    """Quits every driver started by this process"""
+    with _DRIVERS_LOCK:
+        drivers = list(_ALL_DRIVERS)
+    for driver in drivers:
+        _quit_driver(driver)
+
+atexit.register(_shutdown_all)
+
+def _wait_for_page(driver, wait_time, css_selector=None):
+    """Waits for css_selector to match (up to wait_time seconds), or sleeps wait_time without one"""
+    # driver.get() already blocks until document.readyState is "complete" under the default
+    # page load strategy, so only JavaScript-rendered content needs waiting for here
+    if css_selector:
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        timeout = wait_time or DEFAULT_SELENIUM_WAIT
+        try:
+            WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, css_selector)))
+        except TimeoutException:
+            print(f"'{css_selector}' not found after {timeout} seconds, using current content...")
+    elif wait_time > 0:
+        # Without a selector there is no signal for when rendering is done; give it the fixed delay
+        print(f"Waiting {wait_time} seconds for page to load...")
+        time.sleep(wait_time)
+
+def scrape_website(url, wait_time=0, use_selenium=False, wait_for=None):
     try:
         if use_selenium:
-            from selenium import webdriver
-            from selenium.webdriver.chrome.options import Options
-            from selenium.webdriver.chrome.service import Service
-            from webdriver_manager.chrome import ChromeDriverManager
-            
-            # Set up headless Chrome browser
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")
-            chrome_options.add_argument("--disable-gpu")
-            
-            # Initialize browser
-            driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-            
-            # Get the page
-            driver.get(url)
-            
-            # Wait for the specified time to let JavaScript execute
-            if wait_time > 0:
-                print(f"Waiting {wait_time} seconds for page to load...")
-                time.sleep(wait_time)
-            
-            # Get the page source after JavaScript execution
-            html = driver.page_source
-            driver.quit()
+            driver = _acquire_driver()
+            try:
+                # Get the page
+                driver.get(url)
+                
+                # Let JavaScript render: wait for the requested element, or for wait_time seconds
+                _wait_for_page(driver, wait_time, wait_for)
+                
+                # Extract the text in the browser, which already has the rendered DOM
+                text = driver.execute_script(EXTRACT_TEXT_SCRIPT, STRIP_SELECTOR) or ''
+            except Exception:
+                # The browser may be in a bad state; don't hand it to the next caller
+                _quit_driver(driver)
+                raise
+            _release_driver(driver)
             
-            # Parse HTML with BeautifulSoup
-            soup = BeautifulSoup(html, 'html.parser')
+            # Match extract_text's output: trimmed lines, no blank ones
+            return '\n'.join(line.strip() for line in text.split('\n') if line.strip())
         else:
             # Send HTTP request
-            response = requests.get(url)
+            response = _SESSION.get(url, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()  # Raise exception for HTTP errors
             
+            # response.text decodes with the charset from the Content-Type header
+            html = response.text
+            
             # Wait if specified
             if wait_time > 0:
                 print(f"Waiting {wait_time} seconds for page to load...")
                 time.sleep(wait_time)
-                
-            # Parse HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Remove unnecessary elements
-        for element in soup(['style', 'script', 'link', 'meta', 'noscript', 'svg']):
-            element.decompose()
-            
-        # Get text content
-        text = soup.get_text(separator='\n', strip=True)
         
-        return text
+        return extract_text(html)
         
     except Exception as e:
         return f"Error: {str(e)}"
 
+async def _scrape_many(urls, concurrency):
+    """Fetches URLs over one httpx.AsyncClient, with at most concurrency requests in flight"""
+    import httpx
+
+    sem = asyncio.Semaphore(concurrency)
+    # HTTP/2 multiplexing needs the optional h2 package
+    http2 = importlib.util.find_spec("h2") is not None
+
+    async with httpx.AsyncClient(http2=http2, timeout=REQUEST_TIMEOUT, follow_redirects=True,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def scrape_one(url):
+            try:
+                async with sem:
+                    response = await client.get(url)
+                response.raise_for_status()
+                # Parse in a worker thread so other downloads keep progressing
+                return await asyncio.to_thread(extract_text, response.text)
+            except Exception as e:
+                return f"Error: {str(e)}"
+
+        return await asyncio.gather(*[scrape_one(url) for url in urls])
+
+def scrape_many(urls, concurrency=32):
+    """Scrapes several URLs concurrently over plain HTTP, returning their text in order"""
+    return asyncio.run(_scrape_many(urls, concurrency))
+
 # Example usage
 if __name__ == "__main__":
     # Set up argument parser
     parser = argparse.ArgumentParser(description='Web scraper tool')
-    parser.add_argument('url', nargs='?', default="https://example.com",
-                      help='URL to scrape')
+    parser.add_argument('urls', nargs='*', default=["https://example.com"],
+                      help='URLs to scrape')
     parser.add_argument('--wait', type=int, default=0,
-                      help='Wait time in seconds for the page to load')
+                      help='Wait time in seconds for the page to load. With --selenium, the page load itself is '
+                           'already awaited, so this is a fixed delay for JavaScript rendering, or the maximum '
+                           'wait when --wait-for is given (default 10)')
+    parser.add_argument('--wait-for', default=None,
+                      help='With --selenium, CSS selector to wait for before reading the page; returns as soon as it matches')
     parser.add_argument('--selenium', action='store_true',
                       help='Use Selenium for JavaScript-rendered pages')
     
     # Parse arguments
     args = parser.parse_args()
     
-    # Call the scrape function with the provided URL
-    content = scrape_website(args.url, wait_time=args.wait, use_selenium=args.selenium)
+    # Several plain-HTTP URLs are fetched concurrently
+    if len(args.urls) > 1 and not args.selenium and args.wait == 0:
+        contents = scrape_many(args.urls)
+    else:
+        contents = [scrape_website(url, wait_time=args.wait, use_selenium=args.selenium, wait_for=args.wait_for) for url in args.urls]
     
     # Print content
-    print("WEBSITE CONTENT:")
-    print(content)
\ No newline at end of file
+    for content in contents:
+        print("WEBSITE CONTENT:")
+        print(content)
\ No newline at end of file